@@ -1,14 +1,40 @@
 import time
 import logging
+from functools import lru_cache
 from django.conf import settings
+import orjson
 from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import SerializationError
+from elasticsearch.serializer import JSONSerializer
 from pymongo import MongoClient, errors as mongo_errors
 
 logger = logging.getLogger(__name__)
 ELASTICSEARCH = settings.ELASTICSEARCH
 MONGODB = settings.MONGODB
 
-# MongoDB and Elasticsearch clients in one line each
+
+class OrjsonSerializer(JSONSerializer):
+    """Request bodies (bulk payloads above all) encoded and responses decoded by orjson instead of the stdlib json"""
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS  # numpy values of the benchmark data, int keys
+
+    def dumps(self, data):
+        if isinstance(data, (str, bytes)):  # already serialized, like the default serializer
+            return data
+        try:
+            return orjson.dumps(data, default=self.default, option=self.OPTIONS).decode()
+        except orjson.JSONEncodeError as e:
+            raise SerializationError(data, e)
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(s, e)
+
+
+# MongoDB and Elasticsearch clients in one line each.
+# memoized: every module importing them (views, methods, commands) shares one client and its connection pool
+@lru_cache(maxsize=None)
 def get_mongo_client():
     host = MONGODB['HOST']
     port = MONGODB['PORT']
@@ -20,8 +46,9 @@ def get_mongo_client():
         uri = f"mongodb://{user}:{password}@{host}:{port}/{db_name}"
     else:
         uri = f"mongodb://{host}:{port}/{db_name}"
-    return MongoClient(uri)
+    return MongoClient(uri, maxPoolSize=50, minPoolSize=8, retryWrites=False)  # warm sockets for concurrent runs
 
+@lru_cache(maxsize=None)
 def get_els_client():
     host = ELASTICSEARCH['HOST']
     port = ELASTICSEARCH['PORT']
@@ -29,15 +56,21 @@ def get_els_client():
     user = ELASTICSEARCH.get('USER')
     password = ELASTICSEARCH.get('PASSWORD')
 
+    # keep-alive pool shared by bulk/msearch requests, gzip for the large request bodies.
+    # no sniffing: nodes behind docker publish internal addresses the host can't reach
+    pool_kwargs = {'http_compress': True, 'maxsize': 32, 'serializer': OrjsonSerializer(),
+                   'timeout': 60, 'retry_on_timeout': True, 'max_retries': 3}
     if user and password:
         client = Elasticsearch(
             [{'host': host, 'port': port}],
             http_auth=(user, password),
-            use_ssl=use_ssl
+            use_ssl=use_ssl,
+            **pool_kwargs
         )
     else:
         client = Elasticsearch(
             [{'host': host, 'port': port}],
-            use_ssl=use_ssl
+            use_ssl=use_ssl,
+            **pool_kwargs
         )
     return client
@@ -160,7 +160,8 @@ class Command(BaseCommand):
                             }
                         },
                         "price": {
-                            "type": "double"  # Indexed as double for range queries
+                            "type": "scaled_float",  # long of cents internally, queried in dollars for range queries
+                            "scaling_factor": 100
                         },
                         "stock": {
                             "type": "integer"
@@ -212,7 +213,7 @@ MongoDB Collection: table_name
 Elasticsearch Index: table_name  
 - Indexed fields:
   * category (keyword + text fields)
-  * price (double field)
+  * price (scaled_float field, cents)
 - Full text search enabled on:
   * name
   * description
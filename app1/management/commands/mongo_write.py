@@ -1,7 +1,7 @@
 import logging
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, WriteConcern
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import RequestError
 from elasticsearch.helpers import bulk
@@ -14,6 +14,7 @@ import uuid
 
 logger = logging.getLogger('web')
 mongo_collection = get_mongo_client()[settings.MONGODB['NAME']][ProductMongo._meta['collection']]
+load_collection = mongo_collection.with_options(write_concern=WriteConcern(w=1, j=False))  # no journal wait per batch
 
 
 class Command(BaseCommand):
@@ -30,7 +31,7 @@ class Command(BaseCommand):
             logger.info(f"💫 Started writing..")
             for i in range(batch):
                 data = generate_realistic_test_data(records_per_batch)
-                mongo_collection.insert_many(data)
+                load_collection.insert_many(data, ordered=False)
                 logger.info(f"is written {records_per_batch} records. batch: {i}/{batch} continue.. ")
             logger.info(f"👌 Sucessfully saved: {records_per_batch*batch} records to mongo db.")
         except Exception as e:
@@ -1,15 +1,16 @@
 # Standard library imports
-import copy
 import importlib
 import logging
 import os
-import random
 import sys
+import threading
+from collections import OrderedDict
 from functools import partial
 from typing import List, Tuple, Callable
 
 # Third-party imports
 import mongoengine
+import numpy as np
 import pymongo
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import RequestError, NotFoundError
@@ -26,23 +27,39 @@ from .connections import get_mongo_client, get_els_client
 logger = logging.getLogger('web')
 mongo_collection = get_mongo_client()[settings.MONGODB['NAME']][ProductMongo._meta['collection']]
 es_client = get_els_client()
+OPERATIONS = settings.OPERATIONS  # bound once at import ("after change restart manually!"), like views.py
 
 
-def generate_test_data(count):
+# one ~500 char description shared by every generated record instead of 10 concatenations per record
+_TEST_DESCRIPTION = 'This is a detailed description for this product. ' * 10
+
+
+def _random_product_columns(rng, count, category_count):
+    """Draw the random columns of count products in one NumPy pass: (category_idx, price, stock, rating) lists"""
+    category_idx = rng.integers(0, category_count, count).tolist()
+    prices = np.round(rng.uniform(10, 1000, count), 2).tolist()
+    stocks = rng.integers(0, 1001, count).tolist()
+    ratings = np.round(rng.uniform(1, 5, count), 1).tolist()
+    return category_idx, prices, stocks, ratings
+
+
+def generate_test_data(count, seed=None):
     """Generate test product data"""
     categories = ['Electronics', 'Books', 'Clothing', 'Food', 'Toys']
+    category_idx, prices, stocks, ratings = _random_product_columns(np.random.default_rng(seed), count, len(categories))
     return [{
         'name': f'Product {i}',
-        'category': random.choice(categories),
-        'price': round(random.uniform(10, 1000), 2),
-        'stock': random.randint(0, 1000),
-        'description': f'This is a detailed description for product {i}. ' * 10,
-        'rating': round(random.uniform(1, 5), 1)
+        'category': categories[category_idx[i]],
+        'price': prices[i],
+        'stock': stocks[i],
+        'description': _TEST_DESCRIPTION,
+        'rating': ratings[i]
     } for i in range(count)]
 
 
-def generate_realistic_test_data(count):
-    """Generate more realistic test data for better full-text search testing"""
+def generate_realistic_test_data(count, seed=None):
+    """Generate more realistic test data for better full-text search testing (same seed -> same data)"""
+    rng = np.random.default_rng(seed)
     categories = ['Electronics', 'Books', 'Clothing', 'Food', 'Toys', 'Sports', 'Home & Garden']
 
     # More realistic product names and descriptions
@@ -70,47 +87,81 @@ def generate_realistic_test_data(count):
         ]
     }
 
-    data = []
-    for i in range(count):
-        category = random.choice(categories)
+    # random values are drawn column-wise by NumPy, the python loop only assembles the records
+    category_idx, prices, stocks, ratings = _random_product_columns(rng, count, len(categories))
+    template_idx = rng.integers(0, 5, count).tolist()  # every category has 5 templates
 
-        if category in product_templates:
-            name_template, desc_template = random.choice(product_templates[category])
+    data = []
+    append = data.append  # bound once, the loop runs count times
+    get_templates = product_templates.get
+    columns = zip(category_idx, template_idx, prices, stocks, ratings)
+    for i, (category_i, template_i, price, stock, rating) in enumerate(columns):
+        category = categories[category_i]
+        templates = get_templates(category)
+
+        if templates:
+            name_template, desc_template = templates[template_i]
             name = f"{name_template} {i}"
             description = f"{desc_template}. Product ID: {i}. Detailed specifications and features included."
         else:
             name = f'Product {i}'
             description = f'This is a detailed description for product {i} in {category} category. High quality and reliable.'
 
-        product = {
+        append({
             'name': name,
             'category': category,
-            'price': round(random.uniform(10, 1000), 2),
-            'stock': random.randint(0, 1000),
+            'price': price,
+            'stock': stock,
             'description': description,
-            'rating': round(random.uniform(1, 5), 1)
-        }
-        data.append(product)
+            'rating': rating
+        })
 
     return data
 
 
+_test_data_cache = OrderedDict()  # (count, seed) -> tuple of records, least recently used first
+_test_data_cache_lock = threading.Lock()
+
+
+def cached_test_data(count, seed):
+    """
+    Memoized generate_realistic_test_data, repeated benchmark runs reuse the same records.
+    The cache is bounded by settings.TEST_DATA_CACHE_MAX_RECORDS (total records), not by entries count.
+    Returned tuple is shared: consumers that mutate records (like pymongo adding '_id') must get copies.
+    """
+    key = (count, seed)
+    with _test_data_cache_lock:
+        if key in _test_data_cache:
+            _test_data_cache.move_to_end(key)
+            return _test_data_cache[key]
+
+    data = tuple(generate_realistic_test_data(count, seed=seed))
+    with _test_data_cache_lock:
+        _test_data_cache[key] = data
+        while sum(map(len, _test_data_cache.values())) > settings.TEST_DATA_CACHE_MAX_RECORDS:
+            _test_data_cache.popitem(last=False)  # a dataset bigger than the whole budget is not kept either
+    return data
+
+
 class BenchmarkOperationBuilder:
 
-    def generate_argument_for_operations(self, methods):  # required call before build_operations
+    def generate_argument_for_operations(self, methods, seed=None):  # required call before build_operations
         methods = methods.copy()  # required (for .pop)
+        seed = settings.TEST_DATA_SEED if seed is None else seed
+        self.seed = seed  # also seeds the query plans of the strategies (build_operations)
         argument_for_methods = {}
         kwargs_for_methods = {}
         if methods.get('write'):
             write_operation = methods.pop('write')
-            arg1 = generate_realistic_test_data(count=write_operation['query_count'])  # is list
+            arg1 = cached_test_data(write_operation['query_count'], seed)  # read-only tuple shared by every write
             argument_for_methods['write'] = [arg1]
-        if methods.get('read'):
-            read_operation = settings.OPERATIONS['read']
-            if read_operation.get('field_name'):
-                field_name = read_operation.get('field_name')
-                if field_name:
-                    kwargs_for_methods['read'] = {'field_name': field_name}
+        for read_method in ('read', 'read_cached'):  # read_cached: warm app-cache variant of read
+            if methods.get(read_method):
+                read_operation = OPERATIONS[read_method]
+                if read_operation.get('field_name'):
+                    field_name = read_operation.get('field_name')
+                    if field_name:
+                        kwargs_for_methods[read_method] = {'field_name': field_name}
         for method_name, operation in methods.items():  # other operations are only count (int)
             argument_for_methods[method_name] = [operation['query_count']]
         self.argument_for_methods = argument_for_methods
@@ -120,25 +171,26 @@ class BenchmarkOperationBuilder:
     def build_operations(self) -> List[Tuple[str, str, Callable]]:
         """Build operations based on specified tests including full-text search"""
         operations = []
+        # imported here, not at the top, because of circular imports (see database_operations.py)
+        module = importlib.import_module('app1.database_operations')
 
         for db_name, class_name in settings.DATABASES_TO_TEST.items():
-            # Dynamically import the class from database_operations module
-            module = importlib.import_module('app1.database_operations')
+            # Dynamically get the class from database_operations module
             Database = getattr(module, class_name)
 
             if db_name == "Elastic":
-                db_ob = Database(client=es_client)
+                db_ob = Database(client=es_client, seed=self.seed)
             elif db_name == "Mongo":
-                db_ob = Database(client=mongo_collection)
+                db_ob = Database(client=mongo_collection, seed=self.seed)
             elif db_name == "Postgres":
-                db_ob = Database(client=None)  # PostgreSQL uses Django ORM, no client needed
+                db_ob = Database(client=None, seed=self.seed)  # PostgreSQL uses Django ORM, no client needed
 
-            for method_name, operation in settings.OPERATIONS.items():
+            for method_name, operation in OPERATIONS.items():
                 method = getattr(db_ob, method_name, None)
                 if method:
                     args = self.argument_for_methods.get(method_name, None)
                     kwargs = self.kwargs_for_methods.get(method_name, {})
-                    func = partial(method, *[copy.deepcopy(arg) for arg in args], **kwargs) if args else partial(method, count)
+                    func = partial(method, *args, **kwargs) if args else partial(method, count)
                     operations.append((db_name, method_name, operation['query_count'], func))
 
         return operations
@@ -1,10 +1,18 @@
 from rest_framework import serializers
 from .models import Product
 
-class ProductSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Product
-        fields = ['id', 'name', 'category', 'price', 'stock', 'description', 'rating']
+class ProductSerializer(serializers.Serializer):
+    # plain Serializer: no ModelSerializer field introspection per instantiation (many=True list views)
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(max_length=200)
+    category = serializers.CharField(max_length=100)
+    price = serializers.FloatField()
+    stock = serializers.IntegerField()
+    description = serializers.CharField()
+    rating = serializers.FloatField()
+
+    def to_representation(self, instance: Product):
+        return instance.to_dict()  # already a plain dict, skips per-field output conversion
 
 class BenchmarkResultSerializer(serializers.Serializer):
     database = serializers.CharField()
@@ -188,6 +188,7 @@ DATABASES = {
         'CONN_MAX_AGE': 600,  # Connection pooling
         'OPTIONS': {
             'connect_timeout': 10,
+            'options': '-c synchronous_commit=off',  # benchmark db: don't wait for WAL fsync on commit
         },
         'TABLE': 'Product',
         'TABLE2': 'Product2',
@@ -211,6 +212,8 @@ ELASTICSEARCH = {
     #'USER': 'elastic_user',       # Optional: Elasticsearch username
     #'PASSWORD': 'elastic_pass',   # Optional: Elasticsearch password
     'USE_SSL': False,             # Optional: Use HTTPS
+    'REPLICAS': 0,                # Optional: replicas of the index after setup loads it (created with 0)
+    'BULK_THREADS': 8,            # Optional: parallel_bulk threads of setup_tables (connection pool sized to match)
 }
 
 # Password validation
@@ -265,3 +268,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 OPERATIONS = {'read': {'field_name': 'category', 'query_count': 1}}   # do it in all dbs. example: do read for 100 records
 DATABASES_TO_TEST = {'Elastic': 'ElasticBenchmarkStrategy'}
 REFRESH = False          # clear database after each test or not
+TEST_DATA_SEED = 42      # default seed of generated write data (override per request with ?seed=)
+TEST_DATA_CACHE_MAX_RECORDS = 200_000  # generated datasets kept in memory between runs (~300 bytes per record)
+PARALLEL_DATABASES = True  # run benchmarks of different databases concurrently (operations of one database stay in order)
+BENCHMARK_RESULTS_TTL = 60  # seconds the html results page reuses the last successful run
@@ -12,22 +12,234 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dbs_test.settings')
 django.setup()
 
 import pymongo
+from pymongo import WriteConcern
 import mongoengine
 from mongoengine import Document, StringField, DecimalField, IntField, FloatField
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import RequestError
 import json
-from decimal import Decimal
-from elasticsearch import Elasticsearch
+import hashlib
+import orjson
+from elasticsearch import Elasticsearch, helpers
 from elasticsearch.exceptions import RequestError, ConnectionError
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from itertools import chain, islice
 import logging
-from dataclasses import dataclass
-from decimal import Decimal
+from logging.handlers import MemoryHandler
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
 
+from app1.connections import OrjsonSerializer
+
 logger = logging.getLogger('web')
+setup_logger = logging.getLogger('setup')  # console report of the setup_* functions, buffered by main()
+
+# Optional extensions, each in its own exception block (a subtransaction, like a savepoint):
+# a missing extension package doesn't abort the rest of the batch.
+POSTGRES_SETUP_DDL = """
+    DO $$
+    BEGIN
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        EXCEPTION WHEN OTHERS THEN NULL;
+        END;
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS unaccent;
+        EXCEPTION WHEN OTHERS THEN NULL;
+        END;
+    END $$;
+"""
+POSTGRES_EXTENSIONS_QUERY = "SELECT extname FROM pg_extension WHERE extname IN ('pg_trgm', 'unaccent');"
+
+# Stored tsvector behind the full-text GIN index: computed once when a row is written, index builds and
+# rechecks read it instead of evaluating to_tsvector again.
+POSTGRES_TSV_COLUMN = """
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS tsv tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || coalesce(category, ''))
+    ) STORED;
+"""
+
+# Custom PostgreSQL full-text indexes (need pg_trgm, so they live outside the Django model Meta).
+# Shared with the benchmark bulk-load path, which drops and recreates them around large writes.
+# {concurrently}: 'CONCURRENTLY' for setup (no write lock, needs autocommit), '' inside a transaction.
+POSTGRES_FULLTEXT_INDEXES = {
+    'products_fulltext_gin_idx': """
+        CREATE INDEX {concurrently} IF NOT EXISTS products_fulltext_gin_idx
+        ON products
+        USING GIN (tsv);
+    """,
+    'products_name_trgm_idx': """
+        CREATE INDEX {concurrently} IF NOT EXISTS products_name_trgm_idx
+        ON products
+        USING GIN (name gin_trgm_ops);
+    """,
+    'products_description_trgm_idx': """
+        CREATE INDEX {concurrently} IF NOT EXISTS products_description_trgm_idx
+        ON products
+        USING GIN (description gin_trgm_ops);
+    """,
+}
+
+
+# mapping and settings of the products index, optimized for full-text search (read-only, shared by every caller)
+PRODUCT_INDEX_BODY = MappingProxyType({
+    "mappings": {
+        # description is indexed (searchable, highlightable from postings offsets) but not kept in _source:
+        # the benchmarks never read it back, the largest field out of the stored fields keeps .fdt small
+        "_source": {"excludes": ["description"]},
+        # documents carry exactly the six fields below: an unknown field is rejected instead of triggering
+        # a dynamic mapping update (a cluster-state round trip in the middle of a bulk load)
+        "dynamic": "strict",
+        "properties": {
+            # Full-text searchable fields with advanced analysis
+            "name": {
+                "type": "text",
+                "analyzer": "product_name_analyzer",
+                "search_analyzer": "product_search_analyzer",
+                "fields": {
+                    "keyword": {
+                        "type": "keyword"
+                    },
+                    "suggest": {  # as-you-type: bool_prefix multi_match on suggest, suggest._2gram, suggest._3gram
+                        "type": "search_as_you_type",
+                        "max_shingle_size": 3
+                    }
+                }
+            },
+            "description": {
+                "type": "text",
+                "analyzer": "product_description_analyzer",
+                "search_analyzer": "product_search_analyzer",
+                "index_options": "offsets",  # For highlighting: unified highlighter reads offsets from the postings
+                "fields": {
+                    "raw": {
+                        "type": "keyword"
+                    }
+                }
+            },
+            "category": {
+                "type": "text",
+                "analyzer": "keyword",
+                "fields": {
+                    # no eager_global_ordinals: the aggregate benchmark builds them lazily on its first terms agg,
+                    # eager ones would be rebuilt on every refresh (cheaper aggs, slower refresh/ingest)
+                    "keyword": {
+                        "type": "keyword"
+                    },
+                    "suggest": {  # as-you-type: bool_prefix multi_match on suggest, suggest._2gram, suggest._3gram
+                        "type": "search_as_you_type",
+                        "max_shingle_size": 3
+                    }
+                }
+            },
+
+            # Numerical and exact-match fields
+            "price": {
+                "type": "scaled_float",  # stored as a long of cents: exact 2-decimal prices, cheaper range queries
+                "scaling_factor": 100,
+                "index": True
+            },
+            "stock": {
+                "type": "integer",
+                "index": True
+            },
+            "rating": {
+                "type": "float",
+                "index": True
+            }
+        }
+    },
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 0,
+        "index": {
+            # no periodic refresh and async translog while loading, finalize_after_bulk() restores both
+            "refresh_interval": "-1",
+            "translog": {
+                "durability": "async",
+                "sync_interval": "60s",  # static setting: only applies while durability is async
+                "flush_threshold_size": "1gb"
+            },
+            "max_result_window": 50000,
+            # Optimize for search performance
+            "codec": "best_compression",
+            "max_regex_length": 1000
+        },
+        # Advanced analyzers for full-text search
+        "analysis": {
+            "tokenizer": {
+                "product_tokenizer": {
+                    "type": "standard",
+                    "max_token_length": 30  # longer tokens are split, pathological tokens don't bloat the term dictionary
+                }
+            },
+            "filter": {
+                "product_stemmer": {
+                    "type": "stemmer",
+                    "language": "english"
+                },
+                "product_stop": {
+                    "type": "stop",
+                    "stopwords": ["the", "is", "at", "which", "on"]
+                },
+                # search-time only: documents index their own words, queries expand to the synonyms
+                "product_synonym_graph": {
+                    "type": "synonym_graph",
+                    "synonyms": [
+                        "smartphone,mobile,phone",
+                        "laptop,computer,pc",
+                        "tv,television",
+                        "book,novel,guide"
+                    ]
+                },
+                "product_lowercase": {
+                    "type": "lowercase"
+                }
+            },
+            "analyzer": {
+                "product_name_analyzer": {
+                    "type": "custom",
+                    "tokenizer": "product_tokenizer",
+                    "filter": [
+                        "product_lowercase",
+                        "product_stemmer"
+                    ]
+                },
+                "product_description_analyzer": {
+                    "type": "custom",
+                    "tokenizer": "standard",
+                    "filter": [
+                        "product_lowercase",
+                        "product_stop",
+                        "product_stemmer"
+                    ]
+                },
+                "product_search_analyzer": {
+                    "type": "custom",
+                    "tokenizer": "standard",
+                    "filter": [
+                        "product_lowercase",
+                        "product_synonym_graph",
+                        "product_stemmer"
+                    ]
+                }
+            }
+        }
+    }
+})
+
+# the mapping is static: serialized once at import, create_index sends these bytes as they are
+_MAPPING_BYTES = orjson.dumps(dict(PRODUCT_INDEX_BODY))
+_MAPPING_HASH = hashlib.sha256(_MAPPING_BYTES).hexdigest()[:12]  # logged on create, to spot mapping drift
+
+
+def search_index_settings(replicas: int) -> Dict[str, Any]:
+    """Search-time settings of an index created in load mode (PRODUCT_INDEX_BODY): 1s refresh, fsync per request"""
+    return {"index": {"refresh_interval": "1s", "translog": {"durability": "request"}, "number_of_replicas": replicas}}
 
 
 class ProductMongo(Document):
@@ -54,10 +266,10 @@ class ProductMongo(Document):
         ]
     }
 
-    def to_dict(self):
-        """Convert document to dictionary for Elasticsearch"""
+    @cached_property
+    def _source(self):
+        """Elasticsearch body built (and Decimal price converted) once per document, not once per to_dict() call"""
         return {
-            'id': str(self.id),
             'name': self.name,
             'category': self.category,
             'price': float(self.price),
@@ -66,6 +278,20 @@ class ProductMongo(Document):
             'rating': self.rating
         }
 
+    def __setattr__(self, name, value):
+        if name in self._fields:
+            self.__dict__.pop('_source', None)  # built from the old field values
+        super().__setattr__(name, value)
+
+    def to_dict(self, include_id=False):
+        """
+        Convert document to dictionary for Elasticsearch ('id' only for upserts, new documents get generated ids).
+        the returned dict is the cached one (shared between calls), don't mutate it; include_id returns a copy.
+        """
+        if include_id:
+            return {**self._source, 'id': str(self.id)}
+        return self._source
+
 
 class ProductMongo2(Document):
     """MongoDB model using MongoEngine with full-text search support"""
@@ -85,26 +311,57 @@ class ProductMongo2(Document):
     }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ProductData:
-    """Data class for product structure validation"""
+    """Data class for product structure validation (immutable, slotted: no per-instance __dict__)"""
     name: str
     category: str
     price: float
     stock: int
     description: str
     rating: float
+    # to_dict() cache, filled on first call. excluded from init/eq/repr, orjson skips '_' fields in to_json()
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for Elasticsearch"""
-        return {
-            'name': self.name,
-            'category': self.category,
-            'price': self.price,
-            'stock': self.stock,
-            'description': self.description,
-            'rating': self.rating
-        }
+        """Convert to dictionary for Elasticsearch (built once, the instance is immutable; don't mutate the result)"""
+        if self._dict is None:
+            object.__setattr__(self, '_dict', {  # frozen dataclass, the cache is the only field ever set
+                'name': self.name,
+                'category': self.category,
+                'price': self.price,
+                'stock': self.stock,
+                'description': self.description,
+                'rating': self.rating
+            })
+        return self._dict
+
+    def to_json(self) -> str:
+        """Serialized _source for the bulk body, orjson encodes dataclass fields natively (no intermediate dict)"""
+        return orjson.dumps(self).decode()
+
+
+BULK_THREAD_COUNT = settings.ELASTICSEARCH.get('BULK_THREADS', 8)  # parallel_bulk threads, the client pool is sized by it
+_KNOWN_INDICES = set()  # (host, index_name) already seen to exist, create_index skips its request
+_INDEXES_ENSURED = set()  # Document classes whose indexes this process already ensured
+
+
+@lru_cache(maxsize=None)
+def _get_es_client(host: str, auth: Optional[Tuple[str, str]], verify_certs: bool) -> Elasticsearch:
+    """One client (and keep-alive connection pool) per cluster, shared by every ElasticsearchProductManager"""
+    return Elasticsearch(
+        [host],
+        http_auth=auth,
+        verify_certs=verify_certs,
+        timeout=10,  # a down cluster fails fast; bulk and forcemerge pass their own longer timeouts
+        max_retries=2,
+        retry_on_timeout=True,
+        maxsize=max(32, BULK_THREAD_COUNT * 2),  # connections per node: every bulk thread keeps its own
+        http_compress=True,  # gzip the bulk bodies
+        serializer=OrjsonSerializer(),  # same orjson encoding as the benchmark client
+        sniff_on_start=False,  # no blocking cluster state fetch during setup
+        sniff_on_connection_fail=False
+    )
 
 
 class ElasticsearchProductManager:
@@ -112,16 +369,21 @@ class ElasticsearchProductManager:
     Enhanced Elasticsearch manager optimized for full-text search capabilities
     """
 
-    def __init__(self, connection_config: Dict[str, Any]):
+    def __init__(self, connection_config: Dict[str, Any], post_load_replicas: Optional[int] = None):
         """
         Initialize Elasticsearch connection
 
         Args:
             connection_config: Dictionary containing connection parameters
+            post_load_replicas: replicas set by finalize_after_bulk (the index is created and loaded with 0),
+                defaults to settings.ELASTICSEARCH['REPLICAS'] or 0 (single node)
         """
         self.logger = logging.getLogger(__name__)
         self._setup_connection(connection_config)
         self.index_name = connection_config['index_name']
+        if post_load_replicas is None:
+            post_load_replicas = settings.ELASTICSEARCH.get('REPLICAS', 0)
+        self._target_replicas = post_load_replicas
 
     def _setup_connection(self, config: Dict[str, Any]) -> None:
         """Setup Elasticsearch connection with error handling"""
@@ -134,201 +396,186 @@ class ElasticsearchProductManager:
             scheme = 'https' if config.get('use_ssl', False) else 'http'
             host = f"{scheme}://{config['host']}:{config['port']}"
 
-            self.es = Elasticsearch(
-                [host],
-                http_auth=auth,
-                verify_certs=config.get('use_ssl', False),
-                request_timeout=30,
-                max_retries=3,
-                retry_on_timeout=True
-            )
-
-            # Test connection
-            if not self.es.ping():
-                raise ConnectionError("Cannot connect to Elasticsearch")
+            # no ping here: the first real request (create_index) fails fast if the cluster is down
+            self.host = host  # same key as the shared client, identifies the cluster without a request
+            self.es = _get_es_client(host, auth, config.get('use_ssl', False))
 
         except Exception as e:
             self.logger.error(f"Failed to setup Elasticsearch connection: {e}")
             raise
 
+    def delete_index(self) -> None:
+        """Delete the index (missing is fine) and forget it in _KNOWN_INDICES"""
+        self.es.indices.delete(index=self.index_name, ignore=[404])
+        _KNOWN_INDICES.discard((self.host, self.index_name))
+
     def create_index(self) -> bool:
         """
         Create Elasticsearch index optimized for full-text search.
-        This mapping showcases Elasticsearch's full-text search power.
+        The mapping (PRODUCT_INDEX_BODY) showcases Elasticsearch's full-text search power.
+        Durability tradeoff: the index starts with an async translog fsynced every 60s, so a node crash during
+        the load can lose up to 60s of acknowledged documents (they are reloaded anyway). finalize_after_bulk
+        switches back to 'request' durability, every write is fsynced before it is acknowledged.
         """
-        mapping = {
-            "mappings": {
-                "properties": {
-                    # Full-text searchable fields with advanced analysis
-                    "name": {
-                        "type": "text",
-                        "analyzer": "product_name_analyzer",
-                        "search_analyzer": "product_search_analyzer",
-                        "fields": {
-                            "keyword": {
-                                "type": "keyword"
-                            },
-                            "suggest": {
-                                "type": "completion"
-                            }
-                        }
-                    },
-                    "description": {
-                        "type": "text",
-                        "analyzer": "product_description_analyzer",
-                        "search_analyzer": "product_search_analyzer",
-                        "term_vector": "with_positions_offsets",  # For highlighting
-                        "fields": {
-                            "raw": {
-                                "type": "keyword"
-                            }
-                        }
-                    },
-                    "category": {
-                        "type": "text",
-                        "analyzer": "keyword",
-                        "fields": {
-                            "keyword": {
-                                "type": "keyword"
-                            },
-                            "suggest": {
-                                "type": "completion"
-                            }
-                        }
-                    },
-
-                    # Numerical and exact-match fields
-                    "price": {
-                        "type": "double",
-                        "index": True
-                    },
-                    "stock": {
-                        "type": "integer",
-                        "index": True
-                    },
-                    "rating": {
-                        "type": "float",
-                        "index": True
-                    }
-                }
-            },
-            "settings": {
-                "number_of_shards": 1,
-                "number_of_replicas": 0,
-                "index": {
-                    "refresh_interval": "30s",
-                    "max_result_window": 50000,
-                    # Optimize for search performance
-                    "codec": "best_compression",
-                    "max_regex_length": 1000
-                },
-                # Advanced analyzers for full-text search
-                "analysis": {
-                    "tokenizer": {
-                        "product_tokenizer": {
-                            "type": "standard",
-                            "max_token_length": 255
-                        }
-                    },
-                    "filter": {
-                        "product_stemmer": {
-                            "type": "stemmer",
-                            "language": "english"
-                        },
-                        "product_stop": {
-                            "type": "stop",
-                            "stopwords": ["the", "is", "at", "which", "on"]
-                        },
-                        "product_synonym": {
-                            "type": "synonym",
-                            "synonyms": [
-                                "smartphone,mobile,phone",
-                                "laptop,computer,pc",
-                                "tv,television",
-                                "book,novel,guide"
-                            ]
-                        },
-                        "product_lowercase": {
-                            "type": "lowercase"
-                        },
-                        "product_edge_ngram": {
-                            "type": "edge_ngram",
-                            "min_gram": 2,
-                            "max_gram": 10
-                        }
-                    },
-                    "analyzer": {
-                        "product_name_analyzer": {
-                            "type": "custom",
-                            "tokenizer": "product_tokenizer",
-                            "filter": [
-                                "product_lowercase",
-                                "product_synonym",
-                                "product_stemmer"
-                            ]
-                        },
-                        "product_description_analyzer": {
-                            "type": "custom",
-                            "tokenizer": "standard",
-                            "filter": [
-                                "product_lowercase",
-                                "product_stop",
-                                "product_synonym",
-                                "product_stemmer"
-                            ]
-                        },
-                        "product_search_analyzer": {
-                            "type": "custom",
-                            "tokenizer": "standard",
-                            "filter": [
-                                "product_lowercase",
-                                "product_synonym",
-                                "product_stemmer"
-                            ]
-                        },
-                        "autocomplete_analyzer": {
-                            "type": "custom",
-                            "tokenizer": "keyword",
-                            "filter": [
-                                "product_lowercase",
-                                "product_edge_ngram"
-                            ]
-                        }
-                    }
-                }
-            }
-        }
-
         try:
-            if self.es.indices.exists(index=self.index_name):
+            key = (self.host, self.index_name)
+            if key in _KNOWN_INDICES:
+                return True
+            try:  # one round trip: create, an existing index comes back as a 400 instead of a separate HEAD first
+                response = self.es.transport.perform_request(
+                    "PUT", f"/{self.index_name}", body=_MAPPING_BYTES, headers={"content-type": "application/json"}
+                )
+            except RequestError as e:
+                if e.error != 'resource_already_exists_exception':
+                    raise
+                _KNOWN_INDICES.add(key)
                 self.logger.info(f"Index '{self.index_name}' already exists")
                 return True
 
-            response = self.es.indices.create(
-                index=self.index_name,
-                body=mapping
-            )
-
-            self.logger.info(f"Successfully created index: {self.index_name}")
+            _KNOWN_INDICES.add(key)
+            self.logger.info(f"Successfully created index: {self.index_name} (mapping {_MAPPING_HASH})")
             self.logger.info("Index optimized for full-text search with:")
             self.logger.info("- Custom analyzers for name and description")
             self.logger.info("- Synonym support")
             self.logger.info("- Stemming and stop word filtering")
-            self.logger.info("- Edge n-gram for autocomplete")
-            self.logger.info("- Completion suggester support")
+            self.logger.info("- search_as_you_type suggest fields for autocomplete")
             return True
 
         except RequestError as e:
             self.logger.error(f"Error creating index: {e}")
             return False
+        except ConnectionError:
+            raise  # unreachable cluster, reported by the caller
         except Exception as e:
             self.logger.error(f"Unexpected error creating index: {e}")
             return False
 
+    def bulk_index(self, products: Iterable[ProductData], thread_count: int = BULK_THREAD_COUNT, chunk_size: int = 500,
+                   queue_size: int = 4, max_chunk_bytes: int = 50 * 1024 * 1024) -> Tuple[int, int]:
+        """
+        Index products with parallel_bulk: many documents per request, requests sent from several threads.
+        chunk_size is lowered to what fits max_chunk_bytes for the average document size.
+        Returns (indexed_count, failed_count).
+        """
+        # pre-serialized _source strings: the bulk helper sends them as-is with an '{"index":{}}' header,
+        # so no "_id" -> auto-generated ids, elasticsearch skips the per-document version lookup (initial load)
+        # products are consumed lazily: parallel_bulk only holds about thread_count * chunk_size documents
+        docs = (product.to_json() for product in products)
+        sample = list(islice(docs, 100))
+        if not sample:
+            return 0, 0
+        avg_doc_size = max(1, sum(map(len, sample)) // len(sample))
+        chunk_size = max(1, min(chunk_size, max_chunk_bytes // avg_doc_size))
+
+        indexed, failed, chunk_errors = 0, 0, []
+        results = helpers.parallel_bulk(self.es, chain(sample, docs), thread_count=thread_count, chunk_size=chunk_size,
+                                        max_chunk_bytes=max_chunk_bytes, queue_size=queue_size, raise_on_error=False,
+                                        index=self.index_name, request_timeout=60)
+        for i, (ok, info) in enumerate(results, 1):  # results come back in chunk order
+            if ok:
+                indexed += 1
+            else:
+                chunk_errors.append(info)
+            if chunk_errors and i % chunk_size == 0:  # one log line per failed chunk
+                self.logger.error(f"{len(chunk_errors)} documents failed in bulk chunk, first error: {chunk_errors[0]}")
+                failed += len(chunk_errors)
+                chunk_errors = []
+        if chunk_errors:  # last (partial) chunk
+            self.logger.error(f"{len(chunk_errors)} documents failed in bulk chunk, first error: {chunk_errors[0]}")
+            failed += len(chunk_errors)
+
+        self.logger.info(f"Bulk indexed {indexed} documents into '{self.index_name}' ({failed} failed)")
+        return indexed, failed
+
+    def add_products(self, products: Iterable[ProductData], chunk_size: int = 1000) -> Tuple[int, int]:
+        """
+        Index products with streaming_bulk (single thread, up to 10MB per request), refreshed once at the end
+        so they are searchable on return. Returns (indexed_count, failed_count).
+        """
+        actions = (product.to_json() for product in products)  # raw _source strings, auto-generated ids
+        indexed, failed = 0, 0
+        results = helpers.streaming_bulk(self.es, actions, chunk_size=chunk_size, max_chunk_bytes=10 * 1024 * 1024,
+                                         raise_on_error=False, index=self.index_name, request_timeout=60)
+        # per document only lazy debug lines (nothing formatted while debug is off), progress every 1000 documents
+        for i, (ok, info) in enumerate(results, 1):
+            if ok:
+                indexed += 1
+            else:
+                failed += 1
+                self.logger.debug("Failed to index product: %s", info)
+            if i % 1000 == 0:
+                self.logger.info("indexed %d docs (%d failed)", indexed, failed)
+        if failed:
+            self.logger.error("%d documents failed to index into '%s'", failed, self.index_name)
+        self.es.indices.refresh(index=self.index_name)  # one refresh for the whole batch, not one per document
+        return indexed, failed
+
+    def add_product(self, product: ProductData) -> bool:
+        """Index a single product. Deprecated: every call is a request plus a refresh, use add_products"""
+        self.logger.warning("add_product() is deprecated, batch documents with add_products()")
+        indexed, _ = self.add_products([product])
+        return indexed == 1
+
+    def bulk_load(self, products: Iterable[ProductData], forcemerge: bool = False, thread_count: Optional[int] = None,
+                  chunk_size: int = 1000, queue_size: int = 8) -> Tuple[int, int]:
+        """
+        Load products into an existing index in load mode: no refresh, no replicas, async translog while
+        bulk_index (parallel_bulk) runs; search settings (and one refresh) are restored by finalize_after_bulk
+        even on failure. thread_count defaults to _load_thread_count(). Returns (indexed_count, failed_count).
+        """
+        self.es.indices.put_settings(index=self.index_name, body={
+            "index": {"refresh_interval": "-1", "number_of_replicas": 0, "translog": {"durability": "async"}}
+        })
+        try:
+            return self.bulk_index(products, thread_count=thread_count or self._load_thread_count(),
+                                   chunk_size=chunk_size, queue_size=queue_size)
+        finally:
+            self.finalize_after_bulk(forcemerge=forcemerge)
+
+    def _load_thread_count(self) -> int:
+        """
+        Concurrent bulk requests: up to 4 per data node (their write thread pools), no more than local CPUs
+        and BULK_THREAD_COUNT (the client pool holds connections for that many threads only)
+        """
+        data_nodes = self.es.cluster.health()['number_of_data_nodes']
+        return max(1, min(os.cpu_count() or 1, 4 * data_nodes, BULK_THREAD_COUNT))
 
-def setup_mongodb():
-    """Setup MongoDB connection and create indexes including full-text search"""
-    print("📦 Setting up MongoDB...")
+    def upsert_bulk(self, products: List[ProductMongo], chunk_size: int = 500) -> Tuple[int, int]:
+        """
+        Incremental updates: documents keep their MongoDB id as _id, so a product is replaced instead of duplicated.
+        Returns (indexed_count, failed_count).
+        """
+        def actions():
+            for product in products:
+                doc = product.to_dict(include_id=True)
+                yield {"_op_type": "index", "_index": self.index_name, "_id": doc.pop('id'), "_source": doc}
+
+        indexed, failed = helpers.bulk(self.es, actions(), chunk_size=chunk_size, raise_on_error=False, stats_only=True,
+                                       request_timeout=60)
+        if failed:
+            self.logger.error(f"{failed} documents failed to upsert into '{self.index_name}'")
+        return indexed, failed
+
+    def finalize_after_bulk(self, forcemerge: bool = False) -> None:
+        """Restore search-time settings after loading: 1s refresh, per-request translog fsync, target replicas"""
+        # replicas copy the loaded segments once
+        self.es.indices.put_settings(index=self.index_name, body=search_index_settings(self._target_replicas))
+        self.es.indices.refresh(index=self.index_name)  # loaded documents searchable now, not at the next interval
+        if forcemerge:  # loaded data is read-mostly, one segment is the cheapest to search
+            self.es.indices.forcemerge(index=self.index_name, max_num_segments=1, request_timeout=600)
+        self.logger.info(f"Index '{self.index_name}' finalized after bulk load")
+
+
+def ensure_indexes_once(*documents) -> None:
+    """ensure_indexes() once per process and Document class, later setups skip its per-index round trips"""
+    for document in documents:
+        if document not in _INDEXES_ENSURED:
+            document.ensure_indexes()
+            _INDEXES_ENSURED.add(document)
+
+
+def setup_mongodb(seed_products: Optional[Iterable[Dict[str, Any]]] = None):
+    """Setup MongoDB connection and create indexes including full-text search, optionally seeded with seed_products"""
     try:
         # Build MongoDB URI
         if settings.MONGODB.get('USER') and settings.MONGODB.get('PASSWORD'):
@@ -343,26 +590,74 @@ def setup_mongodb():
             alias='default'
         )
 
-        print(f"✅ Connected to MongoDB: {settings.MONGODB['NAME']}")
-
         # Create indexes including full-text search
-        ProductMongo.ensure_indexes()
-        ProductMongo2.ensure_indexes()
-        print("✅ MongoDB indexes created for ProductMongo collection: products")
-        print("   - Category index")
-        print("   - Price index")
-        print("   - Compound index (category, price)")
-        print("   - Full-text search index (name, description, category)")
-
+        ensure_indexes_once(ProductMongo, ProductMongo2)
+        report = (f"📦 MongoDB\n"
+                  f"✅ Connected to MongoDB: {settings.MONGODB['NAME']}\n"
+                  f"✅ MongoDB indexes created for ProductMongo collection: products\n"
+                  f"   - Category index\n"
+                  f"   - Price index\n"
+                  f"   - Compound index (category, price)\n"
+                  f"   - Full-text search index (name, description, category)")
+
+        if seed_products is not None:
+            inserted = bulk_insert_mongo(seed_products)
+            report += f"\n✅ Seeded {inserted} products with unordered insert_many"
+        setup_logger.info(report)
         return True
     except Exception as e:
-        print(f"❌ Error setting up MongoDB: {e}")
+        setup_logger.error(f"❌ Error setting up MongoDB: {e}")
         return False
 
 
-def setup_elasticsearch():
-    """Setup Elasticsearch and create index optimized for full-text search"""
-    print("\n🔍 Setting up Elasticsearch...")
+def bulk_insert_mongo(products: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+    """
+    Insert products into the ProductMongo collection, one unordered insert_many per batch (not one insert per document).
+    The text index is dropped while loading and rebuilt once by ensure_indexes(). Returns inserted count.
+    """
+    collection = ProductMongo._get_collection()
+    for index in collection.list_indexes():
+        if '_fts' in index['key']:  # maintaining the text index per insert dominates the write cost
+            collection.drop_index(index['name'])
+
+    inserted = 0
+    products = iter(products)  # consumed batch by batch, only batch_size documents are held at once
+    # load phase: acknowledged by the primary without waiting for the journal commit (reloaded anyway if lost)
+    load_collection = collection.with_options(write_concern=WriteConcern(w=1, j=False))
+    try:
+        # DecimalField is stored as a double (bson has no Decimal encoder for python's Decimal)
+        while docs := [{**product, 'price': float(product['price'])} for product in islice(products, batch_size)]:
+            inserted += len(load_collection.insert_many(docs, ordered=False, bypass_document_validation=True).inserted_ids)
+    finally:
+        ProductMongo.ensure_indexes()  # always: the text index was dropped above
+        _INDEXES_ENSURED.add(ProductMongo)
+    return inserted
+
+
+def iter_products(fields: Optional[Iterable[str]] = None, batch_size: int = 1000):
+    """
+    Scan the ProductMongo collection as raw dicts (only the given fields, plus '_id'), batch_size per getMore.
+    no_cache(): the queryset doesn't keep what it yielded, memory stays flat on millions of documents.
+    """
+    queryset = ProductMongo.objects.no_cache()
+    if fields:
+        queryset = queryset.only(*fields)
+    return queryset.as_pymongo().batch_size(batch_size)
+
+
+def reindex_mongo_to_elasticsearch(es_manager: ElasticsearchProductManager, batch_size: int = 1000) -> Tuple[int, int]:
+    """Stream every MongoDB product into es_manager's index with bulk_load, nothing is materialized in between"""
+    fields = ('name', 'category', 'price', 'stock', 'description', 'rating')
+    products = (ProductData(**{field: doc[field] for field in fields}) for doc in iter_products(fields, batch_size))
+    return es_manager.bulk_load(products)
+
+
+def setup_elasticsearch(seed_products: Optional[Iterable[Dict[str, Any]]] = None):
+    """
+    Setup Elasticsearch and create index optimized for full-text search, optionally seeded with seed_products.
+    Order matters: create (0 replicas, load mode; doubles as the connection check) -> seed -> finalize (refresh,
+    durability, replicas).
+    """
     try:
         # Create configuration from settings
         config = {
@@ -381,157 +676,193 @@ def setup_elasticsearch():
 
         es_manager = ElasticsearchProductManager(config)
 
-        # Test connection
-        if not es_manager.es.ping():
-            print("❌ Cannot connect to Elasticsearch")
+        # Create index with full-text search optimization (the first request doubles as the connection check)
+        try:
+            index_ready = es_manager.create_index()
+        except ConnectionError:
+            setup_logger.error("❌ Cannot connect to Elasticsearch")
             return False, None
 
-        print("✅ Connected to Elasticsearch")
-
-        # Create index with full-text search optimization
-        if es_manager.create_index():
-            print(f"✅ Elasticsearch index '{settings.ELASTICSEARCH['INDEX_NAME']}' is ready")
-            print("   🚀 Optimized for full-text search with:")
-            print("      - Custom analyzers (name, description, search)")
-            print("      - Synonym support (smartphone=mobile=phone)")
-            print("      - Stemming (running→run, products→product)")
-            print("      - Stop word filtering")
-            print("      - Edge n-gram for autocomplete")
-            print("      - Completion suggester")
-            print("      - Term vectors for highlighting")
+        if index_ready:
+            report = (f"🔍 Elasticsearch\n"
+                      f"✅ Connected to Elasticsearch\n"
+                      f"✅ Elasticsearch index '{settings.ELASTICSEARCH['INDEX_NAME']}' is ready\n"
+                      f"   🚀 Optimized for full-text search with:\n"
+                      f"      - Custom analyzers (name, description, search)\n"
+                      f"      - Synonym support (smartphone=mobile=phone)\n"
+                      f"      - Stemming (running→run, products→product)\n"
+                      f"      - Stop word filtering\n"
+                      f"      - search_as_you_type autocomplete (name.suggest, category.suggest)\n"
+                      f"      - Postings offsets for (unified) highlighting")
+
+            indexed = 0
+            if seed_products is not None:
+                products = (ProductData(**{**product, 'price': float(product['price'])}) for product in seed_products)
+                indexed, failed = es_manager.bulk_index(products)
+                report += f"\n✅ Seeded {indexed} products with parallel bulk ({failed} failed)"
+            # index is created in load mode (refresh off, async translog), switch it to search mode
+            es_manager.finalize_after_bulk(forcemerge=indexed > 0)
+            setup_logger.info(report)
             return True, es_manager
         else:
             return False, None
 
     except Exception as e:
-        print(f"❌ Error setting up Elasticsearch: {e}")
+        setup_logger.error(f"❌ Error setting up Elasticsearch: {e}")
         return False, None
 
 
+def _create_postgres_index(cursor, index_name, sql):
+    """CREATE INDEX CONCURRENTLY (django runs in autocommit outside atomic), a failed build is dropped and retried once"""
+    # an interrupted earlier run leaves an INVALID index, IF NOT EXISTS alone would accept it as done
+    cursor.execute("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s);", [index_name])
+    row = cursor.fetchone()
+    if row and row[0]:
+        setup_logger.warning(f"⚠️  Index {index_name} is invalid (interrupted build), rebuilding")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+    try:
+        cursor.execute(sql.format(concurrently='CONCURRENTLY'))
+    except Exception as e:
+        # a failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep forever
+        setup_logger.warning(f"⚠️  Index {index_name} build failed ({e}), retrying")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+        cursor.execute(sql.format(concurrently='CONCURRENTLY'))
+
+
 def setup_postgresql_fulltext():
     """Setup PostgreSQL full-text search extensions"""
-    print("\n🐘 Setting up PostgreSQL full-text search...")
+    from django.db import connection
+
     try:
-        from django.db import connection
+        with connection.cursor() as cursor:
+            # Enable PostgreSQL full-text search extensions and read back which are installed in one round trip
+            cursor.execute(POSTGRES_SETUP_DDL + POSTGRES_EXTENSIONS_QUERY)
+            enabled = {row[0] for row in cursor.fetchall()}
+        report = ["🐘 PostgreSQL full-text search"]
+        for extension, purpose in (('pg_trgm', 'similarity search'), ('unaccent', 'accent-insensitive search')):
+            if extension in enabled:
+                report.append(f"✅ {extension} extension enabled (for {purpose})")
+            else:
+                report.append(f"⚠️  {extension} extension not available (optional)")
+
+        # own statement (autocommit: own transaction), a failing ALTER can't roll the extensions back
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRES_TSV_COLUMN)
+            report.append("✅ Stored tsvector column (tsv) ready")
+        except Exception as e:
+            report.append(f"⚠️  Could not add the tsv column: {e}")
 
+        # Create the GIN full-text and trigram (similarity search) indexes one after another on one connection:
+        # concurrent builds on the same table conflict (SHARE UPDATE EXCLUSIVE), parallel ones would only wait
         with connection.cursor() as cursor:
-            # Enable PostgreSQL full-text search extensions
-            try:
-                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
-                print("✅ pg_trgm extension enabled (for similarity search)")
-            except:
-                print("⚠️  pg_trgm extension not available (optional)")
-
-            try:
-                cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent;")
-                print("✅ unaccent extension enabled (for accent-insensitive search)")
-            except:
-                print("⚠️  unaccent extension not available (optional)")
-
-            # Create GIN indexes for full-text search
-            try:
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS products_fulltext_gin_idx 
-                    ON products 
-                    USING GIN (to_tsvector('english', name || ' ' || description || ' ' || category));
-                """)
-                print("✅ GIN full-text search index created")
-            except Exception as e:
-                print(f"⚠️  Could not create GIN index: {e}")
-
-            # Create trigram indexes for similarity search
-            try:
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS products_name_trgm_idx 
-                    ON products 
-                    USING GIN (name gin_trgm_ops);
-                """)
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS products_description_trgm_idx 
-                    ON products 
-                    USING GIN (description gin_trgm_ops);
-                """)
-                print("✅ Trigram indexes created for similarity search")
-            except Exception as e:
-                print(f"⚠️  Could not create trigram indexes: {e}")
-
-        print("✅ PostgreSQL full-text search setup completed")
+            for index_name, sql in POSTGRES_FULLTEXT_INDEXES.items():
+                try:
+                    _create_postgres_index(cursor, index_name, sql)
+                    report.append(f"✅ Index {index_name} created")
+                except Exception as e:
+                    report.append(f"⚠️  Could not create index {index_name}: {e}")
+
+        report.append("✅ PostgreSQL full-text search setup completed")
+        setup_logger.info('\n'.join(report))
         return True
 
     except Exception as e:
-        print(f"❌ Error setting up PostgreSQL full-text search: {e}")
+        setup_logger.error(f"❌ Error setting up PostgreSQL full-text search: {e}")
         return False
+    finally:
+        connection.close()  # main() runs the setup in a worker thread, which has its own django connection
+
+
+def iter_sample_products():
+    """Example products optimized for full-text search testing, yielded lazily (float prices, like the index stores)"""
+    yield {
+        'name': 'Premium Wireless Smartphone Pro Max',
+        'category': 'Electronics',
+        'price': 899.99,
+        'stock': 50,
+        'description': 'High-quality premium smartphone with advanced camera technology, long-lasting battery life, and wireless charging capabilities. Perfect for professional photography and mobile gaming.',
+        'rating': 4.8
+    }
+    yield {
+        'name': 'Professional Programming Guide Book',
+        'category': 'Books',
+        'price': 49.99,
+        'stock': 100,
+        'description': 'Comprehensive programming guide for software developers. Covers advanced algorithms, data structures, and best practices for modern software development.',
+        'rating': 4.5
+    }
+    yield {
+        'name': 'Ultra Gaming Laptop Computer',
+        'category': 'Electronics',
+        'price': 1299.99,
+        'stock': 25,
+        'description': 'Powerful gaming laptop with high-performance graphics card, fast processor, and premium display. Ideal for gaming, video editing, and professional work.',
+        'rating': 4.7
+    }
 
 
 def create_sample_product_example():
     """Example of how to create a product optimized for full-text search testing"""
-    example_products = [
-        {
-            'name': 'Premium Wireless Smartphone Pro Max',
-            'category': 'Electronics',
-            'price': Decimal('899.99'),
-            'stock': 50,
-            'description': 'High-quality premium smartphone with advanced camera technology, long-lasting battery life, and wireless charging capabilities. Perfect for professional photography and mobile gaming.',
-            'rating': 4.8
-        },
-        {
-            'name': 'Professional Programming Guide Book',
-            'category': 'Books',
-            'price': Decimal('49.99'),
-            'stock': 100,
-            'description': 'Comprehensive programming guide for software developers. Covers advanced algorithms, data structures, and best practices for modern software development.',
-            'rating': 4.5
-        },
-        {
-            'name': 'Ultra Gaming Laptop Computer',
-            'category': 'Electronics',
-            'price': Decimal('1299.99'),
-            'stock': 25,
-            'description': 'Powerful gaming laptop with high-performance graphics card, fast processor, and premium display. Ideal for gaming, video editing, and professional work.',
-            'rating': 4.7
-        }
-    ]
+    return list(iter_sample_products())
 
-    return example_products
+
+def configure_setup_logging():
+    """setup_logger output is buffered in memory and written to stdout at once (on errors or at shutdown)"""
+    if any(isinstance(handler, MemoryHandler) for handler in setup_logger.handlers):
+        return  # already configured (main() called again in this process), a second buffer would duplicate lines
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    setup_logger.addHandler(MemoryHandler(capacity=1000, flushLevel=logging.ERROR, target=console))
+    setup_logger.setLevel(logging.INFO)
+    setup_logger.propagate = False
 
 
 def main():
     """Main function to setup databases with full-text search capabilities"""
-    print("=== Initializing Databases with Full-Text Search Support ===\n")
-
-    # Setup PostgreSQL full-text search
-    postgres_ft_success = setup_postgresql_fulltext()
-
-    # Setup MongoDB
-    mongo_success = setup_mongodb()
-
-    # Setup Elasticsearch
-    es_success, es_manager = setup_elasticsearch()
+    configure_setup_logging()
+    setup_logger.info("=== Initializing Databases with Full-Text Search Support ===\n")
+
+    # PostgreSQL full-text search, MongoDB and Elasticsearch are independent, they are set up concurrently
+    # (threads, not asyncio: the sync drivers release the GIL while waiting on sockets, so wall time is already
+    # the slowest setup, not the sum, without a second set of async clients)
+    # (python setup_tables.py --with-samples also loads the example products into MongoDB and Elasticsearch)
+    with_samples = '--with-samples' in sys.argv
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        postgres_future = executor.submit(setup_postgresql_fulltext)
+        # every consumer gets its own generator (a generator can only be iterated once)
+        mongo_future = executor.submit(setup_mongodb, iter_sample_products() if with_samples else None)
+        es_future = executor.submit(setup_elasticsearch, iter_sample_products() if with_samples else None)
+    postgres_ft_success = postgres_future.result()
+    mongo_success = mongo_future.result()
+    es_success, es_manager = es_future.result()
 
     # Summary
-    print("\n" + "=" * 60)
-    print("🎯 FULL-TEXT SEARCH SETUP SUMMARY")
-    print("=" * 60)
-    print(f"PostgreSQL FT: {'✅ Ready' if postgres_ft_success else '❌ Failed'}")
-    print(f"MongoDB FT:    {'✅ Ready' if mongo_success else '❌ Failed'}")
-    print(f"Elasticsearch: {'✅ Ready' if es_success else '❌ Failed'}")
+    summary = ("\n" + "=" * 60 + "\n"
+               "🎯 FULL-TEXT SEARCH SETUP SUMMARY\n" +
+               "=" * 60 + "\n"
+               f"PostgreSQL FT: {'✅ Ready' if postgres_ft_success else '❌ Failed'}\n"
+               f"MongoDB FT:    {'✅ Ready' if mongo_success else '❌ Failed'}\n"
+               f"Elasticsearch: {'✅ Ready' if es_success else '❌ Failed'}\n")
 
     if postgres_ft_success and mongo_success and es_success:
-        print("\n🚀 ALL DATABASES READY FOR FULL-TEXT SEARCH BENCHMARKING!")
-        print("\n📊 Expected Performance Rankings for Full-Text Search:")
-        print("   🥇 1st: Elasticsearch (Optimized for search)")
-        print("   🥈 2nd: MongoDB (Good text indexing)")
-        print("   🥉 3rd: PostgreSQL (Basic full-text features)")
-
-        print("\n🧪 Test with these query examples:")
-        print('   - tests: ["full_text_search_simple"]')
-        print('   - tests: ["full_text_search_complex"]')
-        print('   - tests: ["write", "full_text_search_simple", "full_text_search_complex"]')
-
+        summary += ("\n🚀 ALL DATABASES READY FOR FULL-TEXT SEARCH BENCHMARKING!\n"
+                    "\n📊 Expected Performance Rankings for Full-Text Search:\n"
+                    "   🥇 1st: Elasticsearch (Optimized for search)\n"
+                    "   🥈 2nd: MongoDB (Good text indexing)\n"
+                    "   🥉 3rd: PostgreSQL (Basic full-text features)\n"
+                    "\n🧪 Test with these query examples:\n"
+                    '   - tests: ["full_text_search_simple"]\n'
+                    '   - tests: ["full_text_search_complex"]\n'
+                    '   - tests: ["write", "full_text_search_simple", "full_text_search_complex"]')
     else:
-        print("\n⚠️  Some databases failed to initialize. Check the errors above.")
-        print("💡 Full-text search benchmarking may not work properly.")
+        summary += ("\n⚠️  Some databases failed to initialize. Check the errors above.\n"
+                    "💡 Full-text search benchmarking may not work properly.")
+    setup_logger.info(summary)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        logging.shutdown()  # flushes the buffered setup report
@@ -7,7 +7,10 @@ a = 22
 import os
 import sys
 import django
+from contextlib import ExitStack
 from decimal import Decimal
+from functools import lru_cache
+from pymongo import WriteConcern
 
 # Add the project directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -16,11 +19,28 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dbs_test.settings')
 django.setup()
 
+from django.conf import settings
 from django.db import connection
 from app1.models import Product
 from app1.connections import get_mongo_client, get_els_client
-es_client = get_els_client()
-mongo_collection = get_mongo_client()
+from setup_tables import ProductMongo
+
+# clients are created by the first test that needs them (a postgres-only run opens none) and closed once by main()
+_clients = ExitStack()
+
+
+@lru_cache(maxsize=1)
+def _es():
+    client = get_els_client()
+    _clients.callback(client.transport.close)
+    return client
+
+
+@lru_cache(maxsize=1)
+def _mongo():
+    client = get_mongo_client()
+    _clients.callback(client.close)
+    return client[settings.MONGODB['NAME']][ProductMongo._meta['collection']]
 
 
 def test_postgresql():
@@ -62,6 +82,7 @@ def test_mongodb():
     """Test MongoDB connection and basic operations"""
     print("\n2. Testing MongoDB Connection...")
     try:
+        mongo_collection = _mongo()
         # Test insert
         result = mongo_collection.insert_one({
             'name': 'Test MongoDB Product',
@@ -92,10 +113,43 @@ def test_mongodb():
         return False
 
 
+def bulk_smoke_test(n=10_000):
+    """Bulk MongoDB round trip: one insert_many, a batched cursor scan and one delete_many (not n single-doc requests)"""
+    print(f"\n2b. Testing MongoDB bulk operations ({n} documents)...")
+    ids = []
+    mongo_collection = _mongo()
+    try:
+        docs = [{
+            'name': f'Bulk Test Product {i}',
+            'category': 'BulkTest',
+            'price': 99.99,
+            'stock': 100,
+            'description': 'Bulk smoke test description',
+            'rating': 4.5
+        } for i in range(n)]
+        load_collection = mongo_collection.with_options(write_concern=WriteConcern(w=1, j=False))
+        ids = load_collection.insert_many(docs, ordered=False).inserted_ids
+        print(f"   ✓ Successfully inserted {len(ids)} documents")
+
+        # plain dicts of one field, 1000 per getMore: consumed as a stream, nothing kept in memory
+        cursor = mongo_collection.find({'category': 'BulkTest'}, projection={'name': 1, '_id': 0}).batch_size(1000)
+        scanned = sum(1 for _ in cursor)
+        print(f"   ✓ Successfully scanned {scanned} documents")
+        return scanned >= len(ids)
+    except Exception as e:
+        print(f"   ✗ MongoDB bulk test failed: {e}")
+        return False
+    finally:
+        if ids:
+            deleted = mongo_collection.delete_many({'_id': {'$in': ids}}).deleted_count
+            print(f"   ✓ Successfully deleted {deleted} test documents")
+
+
 def test_elasticsearch():
     """Test Elasticsearch connection and basic operations"""
     print("\n3. Testing Elasticsearch Connection...")
     try:
+        es_client = _es()
         # Check cluster health
         health = es_client.cluster.health()
         print(f"   ✓ Elasticsearch cluster status: {health['status']}")
@@ -134,17 +188,28 @@ def test_elasticsearch():
         return False
 
 
+TESTS = {
+    'PostgreSQL': test_postgresql,
+    'MongoDB': test_mongodb,
+    'MongoDB bulk': bulk_smoke_test,
+    'Elasticsearch': test_elasticsearch
+}
+
+
 def main():
-    """Run all connection tests"""
+    """Run all connection tests, or only the ones named on the command line (like: python test_connections.py PostgreSQL)"""
     print("=" * 60)
     print("Database Connection Test Suite")
     print("=" * 60)
 
-    results = {
-        'PostgreSQL': test_postgresql(),
-        'MongoDB': test_mongodb(),
-        'Elasticsearch': test_elasticsearch()
-    }
+    selected = sys.argv[1:] or list(TESTS)
+    unknown = [name for name in selected if name not in TESTS]
+    if unknown:
+        print(f"Unknown test(s): {', '.join(unknown)}")
+        print(f"Valid names: {', '.join(repr(name) for name in TESTS)}")
+        return 1
+    with _clients:
+        results = {name: TESTS[name]() for name in selected}
 
     print("\n" + "=" * 60)
     print("Test Summary:")